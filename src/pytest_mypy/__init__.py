@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+import io
 import json
+import os
 from pathlib import Path
+import re
+import subprocess  # nosec B404
+import sys
 from tempfile import NamedTemporaryFile
 import typing
 
-from filelock import FileLock
-import mypy.api
 import pytest
 
 if typing.TYPE_CHECKING:  # pragma: no cover
@@ -20,6 +25,7 @@ if typing.TYPE_CHECKING:  # pragma: no cover
         Iterator,
         List,
         Optional,
+        Set,
         Tuple,
         Union,
     )
@@ -33,6 +39,8 @@ if typing.TYPE_CHECKING:  # pragma: no cover
     # https://github.com/pytest-dev/pytest-xdist/issues/1121
     from xdist.workermanage import WorkerController  # type: ignore
 
+    import mypy.options
+
 
 @dataclass(frozen=True)  # compat python < 3.10 (kw_only=True)
 class MypyConfigStash:
@@ -55,6 +63,20 @@ stash_key = {
     "config": pytest.StashKey[MypyConfigStash](),
 }
 terminal_summary_title = "mypy"
+# Each process reads the results of a session at most once:
+_session_results_key = pytest.StashKey["MypyResults"]()
+# Each session collects at most one MypyStatusItem:
+_status_item_collected_key = pytest.StashKey[bool]()
+# mypy arguments derived from the CLI (which is the same for every process):
+_cli_argv_key = pytest.StashKey[typing.List[str]]()
+# The pytest cache entry used by --mypy-reuse-results:
+_reusable_results_cache_key = "mypy/reusable_results"
+# The summary line that ends a mypy report:
+_mypy_summary_pattern = re.compile(
+    r"Found \d+ errors? in \d+ files? \(.*\)|Success: no issues found in .*"
+)
+# The first line of a mypy message (which --pretty may continue on more lines):
+_mypy_message_pattern = re.compile(r"\S.*?: (?:error|note|warning): ")
 
 
 def default_file_error_formatter(
@@ -84,11 +106,51 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         type=str,
         help="adds custom mypy config file",
     )
+    group.addoption(
+        "--mypy-cache-dir",
+        action="store",
+        type=str,
+        help="store mypy's incremental cache in this directory "
+        "(e.g. one that CI preserves between runs)",
+    )
+    group.addoption(
+        "--mypy-daemon",
+        action="store_true",
+        help="run mypy via its daemon, which keeps running after the session "
+        "so that later sessions only recheck what changed (stop it with "
+        "'dmypy stop')",
+    )
+    group.addoption(
+        "--mypy-fixed-format-cache",
+        action="store_true",
+        help="make mypy 1.18 or 1.19 use its faster cache format "
+        "(the default since mypy 2.0)",
+    )
+    group.addoption(
+        "--mypy-jobs",
+        action="store",
+        type=int,
+        help="split the top-level packages among up to this many mypy processes "
+        "(only faster for packages that do not import each other)",
+    )
+    group.addoption(
+        "--mypy-no-incremental",
+        action="store_true",
+        help="make mypy ignore its cache, e.g. when the cache is suspect",
+    )
     group.addoption(
         "--mypy-no-status-check",
         action="store_true",
         help="ignore mypy's exit status",
     )
+    group.addoption(
+        "--mypy-reuse-results",
+        action="store_true",
+        help="skip mypy when the checked files, the options and config file "
+        "mypy uses, and the mypy version have not changed since the last run "
+        "with this option (changes to other files, like the dependencies of "
+        "the checked files, are not detected)",
+    )
     group.addoption(
         "--mypy-xfail",
         action="store_true",
@@ -156,28 +218,86 @@ def pytest_configure(config: pytest.Config) -> None:
         "markers",
         f"{item_marker}: mark tests to be checked by mypy.",
     )
+    # The arguments derived from the CLI are kept apart from mypy_argv,
+    # which stays reserved for conftest.py customization.
+    cli_argv = []
     if config.getoption("--mypy-ignore-missing-imports"):
-        mypy_argv.append("--ignore-missing-imports")
+        cli_argv.append("--ignore-missing-imports")
 
     mypy_config_file = config.getoption("--mypy-config-file")
     if mypy_config_file:
-        mypy_argv.append(f"--config-file={mypy_config_file}")
+        cli_argv.append(f"--config-file={mypy_config_file}")
+
+    mypy_cache_dir = config.getoption("--mypy-cache-dir")
+    if mypy_cache_dir:
+        cli_argv.append(f"--cache-dir={mypy_cache_dir}")
+
+    if config.getoption("--mypy-reuse-results") and not hasattr(config, "cache"):
+        raise pytest.UsageError(
+            "--mypy-reuse-results requires the cacheprovider plugin "
+            "(which -p no:cacheprovider disables)"
+        )
+
+    if config.getoption("--mypy-no-incremental"):
+        if config.getoption("--mypy-daemon"):
+            raise pytest.UsageError(
+                "--mypy-no-incremental cannot be combined with --mypy-daemon "
+                "(the mypy daemon is always incremental)"
+            )
+        cli_argv.append("--no-incremental")
 
     if any(
         [
             config.option.mypy,
+            config.option.mypy_cache_dir,
             config.option.mypy_config_file,
+            config.option.mypy_daemon,
+            config.option.mypy_fixed_format_cache,
             config.option.mypy_ignore_missing_imports,
+            config.option.mypy_jobs,
+            config.option.mypy_no_incremental,
             config.option.mypy_no_status_check,
+            config.option.mypy_reuse_results,
             config.option.mypy_xfail,
         ],
     ):
         config.pluginmanager.register(MypyCollectionPlugin())
 
+        if config.getoption("--mypy-fixed-format-cache"):
+            # mypy is slow to import, so only import it when it may run.
+            import mypy.options
+
+            fixed_format_cache = getattr(
+                mypy.options.Options(), "fixed_format_cache", None
+            )
+            if fixed_format_cache is None:
+                raise pytest.UsageError(
+                    "--mypy-fixed-format-cache requires mypy 1.18 or later"
+                )
+            if not fixed_format_cache:
+                cli_argv.append("--fixed-format-cache")
+    config.stash[_cli_argv_key] = cli_argv
+
 
 class MypyCollectionPlugin:
     """A Pytest plugin that collects MypyFiles."""
 
+    def __init__(self) -> None:
+        self._pyi_names = {}  # type: Dict[Path, Set[str]]
+
+    def _pyi_names_in(self, directory: Path) -> Set[str]:
+        """List the .pyi files in a directory once instead of once per .py file."""
+        try:
+            return self._pyi_names[directory]
+        except KeyError:
+            with os.scandir(directory) as entries:
+                pyi_names = self._pyi_names[directory] = {
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith(".pyi") and entry.is_file()
+                }
+            return pyi_names
+
     def pytest_collect_file(
         self,
         file_path: Path,
@@ -188,10 +308,9 @@ class MypyCollectionPlugin:
             # Do not create MypyFile instance for a .py file if a
             # .pyi file with the same name already exists;
             # pytest will complain about duplicate modules otherwise
-            if (
-                file_path.suffix == ".pyi"
-                or not file_path.with_suffix(".pyi").is_file()
-            ):
+            if file_path.suffix == ".pyi" or file_path.with_suffix(
+                ".pyi"
+            ).name not in self._pyi_names_in(file_path.parent):
                 return MypyFile.from_parent(parent=parent, path=file_path)
         return None
 
@@ -205,9 +324,10 @@ class MypyFile(pytest.File):
         # Since mypy might check files that were not collected,
         # pytest could pass even though mypy failed!
         # To prevent that, add an explicit check for the mypy exit status.
-        if not self.session.config.option.mypy_no_status_check and not any(
-            isinstance(item, MypyStatusItem) for item in self.session.items
+        if not self.session.config.option.mypy_no_status_check and not (
+            self.session.stash.get(_status_item_collected_key, False)
         ):
+            self.session.stash[_status_item_collected_key] = True
             yield MypyStatusItem.from_parent(
                 parent=self,
                 name=nodeid_name + "-status",
@@ -236,11 +356,13 @@ class MypyItem(pytest.Item):
 
 
 def _error_severity(error: str) -> str:
-    components = [component.strip() for component in error.split(":")]
+    # Only the leading components matter, so leave the message unsplit.
+    components = error.split(":", 3)
     # The second component is either the line or the severity:
     # demo/note.py:2: note: By default the bodies of untyped functions are not checked
     # demo/sub/conftest.py: error: Duplicate module named "conftest"
-    return components[2] if components[1].isdigit() else components[1]
+    line_or_severity = components[1].strip()
+    return components[2].strip() if line_or_severity.isdigit() else line_or_severity
 
 
 class MypyFileItem(MypyItem):
@@ -249,7 +371,7 @@ class MypyFileItem(MypyItem):
     def runtest(self) -> None:
         """Raise an exception if mypy found errors for this item."""
         results = MypyResults.from_session(self.session)
-        abspath = str(self.path.resolve())
+        abspath = os.path.realpath(self.path)
         errors = [
             error.partition(":")[2].strip()
             for error in results.abspath_errors.get(abspath, [])
@@ -292,6 +414,147 @@ class MypyStatusItem(MypyItem):
             raise MypyError(f"mypy exited with status {results.status}.")
 
 
+def _mypy_run_daemon(args: List[str]) -> Tuple[str, str, int]:
+    """Run mypy via its daemon, starting the daemon if it is not running."""
+    # dmypy forks to start the daemon, so run it in a separate process:
+    # a fork of this one would keep its file descriptors (e.g. the pipes
+    # of pytest's output capture or of xdist) open until the daemon stops.
+    dmypy = subprocess.run(  # nosec B603
+        [sys.executable, "-m", "mypy.dmypy", "run", "--", *args],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+        encoding="utf-8",
+    )
+    return dmypy.stdout, dmypy.stderr, dmypy.returncode
+
+
+def _counted(count: int, noun: str) -> str:
+    return f"{count} {noun}{'' if count == 1 else 's'}"
+
+
+def _mypy_summary(lines: List[str], source_count: int, *, blocked: bool) -> str:
+    """Summarize the lines of a mypy report like mypy does."""
+    errors = [line for line in lines if ": error:" in line]
+    if not errors:
+        return f"Success: no issues found in {_counted(source_count, 'source file')}"
+    error_file_count = len({error.split(":")[0] for error in errors})
+    details = (
+        "errors prevented further checking"
+        if blocked
+        else f"checked {_counted(source_count, 'source file')}"
+    )
+    return (
+        f"Found {_counted(len(errors), 'error')} "
+        f"in {_counted(error_file_count, 'file')} ({details})"
+    )
+
+
+def _mypy_messages(lines: List[str]) -> List[Tuple[str, ...]]:
+    """Group each mypy message with the lines that continue it."""
+    messages = []  # type: List[Tuple[str, ...]]
+    for line in lines:
+        if messages and not _mypy_message_pattern.match(line):
+            messages[-1] += (line,)
+        else:
+            messages.append((line,))
+    return messages
+
+
+def _mypy_options(opts: List[str]) -> Optional[mypy.options.Options]:
+    """Get the options mypy would use (or None if mypy would reject them)."""
+    import mypy.main
+
+    try:
+        _, options = mypy.main.process_options(
+            opts,
+            stdout=io.StringIO(),
+            stderr=io.StringIO(),
+            require_targets=False,
+        )
+    except SystemExit:
+        return None
+    return options
+
+
+def _mypy_run_shards(
+    opts: List[str],
+    paths: List[str],
+    jobs: int,
+) -> Tuple[str, str, int]:
+    """Run mypy on up to jobs shards of the paths in parallel."""
+    import mypy.api
+
+    # Modules of the same top-level package usually import each other,
+    # so keep each package in one shard, filling the smallest shard first.
+    packages = {}  # type: Dict[str, List[str]]
+    for path in paths:
+        packages.setdefault(path.split(os.sep, 1)[0], []).append(path)
+    if len(packages) == 1:
+        return mypy.api.run(opts + paths)
+    shards = [[] for _ in range(min(jobs, len(packages)))]  # type: List[List[str]]
+    for package_paths in sorted(packages.values(), key=len, reverse=True):
+        min(shards, key=len).extend(package_paths)
+    # Concurrent mypy processes must not share a cache, so give each shard
+    # its own directory within the one mypy would use for these options
+    # (from the CLI, $MYPY_CACHE_DIR or the config file).
+    options = _mypy_options(opts)
+    if options is None:
+        # Let mypy report the invalid options.
+        return mypy.api.run(opts + paths)
+    cache_dirs = [
+        (
+            os.devnull  # the cache is disabled
+            if options.cache_dir == os.devnull
+            else os.path.join(options.cache_dir, f"shard-{i}")
+        )
+        for i in range(len(shards))
+    ]
+    shard_args = [
+        opts + [f"--cache-dir={cache_dir}"] + shard
+        for cache_dir, shard in zip(cache_dirs, shards)
+    ]
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        outputs = list(executor.map(mypy.api.run, shard_args))
+    # Every shard that imports a module reports the same messages for it,
+    # so keep each message as many times as the shard that repeats it most,
+    # in the order the shards report them.
+    # Each shard also summarizes its own sources on its last line,
+    # so replace those lines with one summary of the merged lines.
+    lines = []  # type: List[str]
+    message_counts = Counter()  # type: Counter[Tuple[str, ...]]
+    summaries = []
+    for stdout, _, _ in outputs:
+        shard_lines = stdout.splitlines()
+        if shard_lines and _mypy_summary_pattern.fullmatch(shard_lines[-1]):
+            summaries.append(shard_lines.pop())
+        shard_message_counts = Counter()  # type: Counter[Tuple[str, ...]]
+        for message in _mypy_messages(shard_lines):
+            shard_message_counts[message] += 1
+            if shard_message_counts[message] > message_counts[message]:
+                message_counts[message] += 1
+                lines.extend(message)
+    if summaries:
+        lines.append(
+            _mypy_summary(
+                lines,
+                len(paths),
+                blocked=any("errors prevented" in summary for summary in summaries),
+            )
+        )
+    return (
+        "".join(line + "\n" for line in lines),
+        "".join(stderr for _, stderr, _ in outputs),
+        max(status for _, _, status in outputs),
+    )
+
+
+def _stat_signature(path: Union[Path, str]) -> List[int]:
+    """Summarize the state of a file in a JSON-compatible way."""
+    stat_result = os.stat(path)
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+
 @dataclass(frozen=True)  # compat python < 3.10 (kw_only=True)
 class MypyResults:
     """Parsed results from Mypy."""
@@ -315,32 +578,57 @@ class MypyResults:
         """Get results cached by dump()."""
         return cls(**json.loads(results_f.read().decode(cls._encoding)))
 
+    @classmethod
+    def _load_if_exists(cls, results_path: Path) -> Optional[MypyResults]:
+        try:
+            with open(results_path, mode="rb") as results_f:
+                return cls.load(results_f)
+        except FileNotFoundError:
+            return None
+
     @classmethod
     def from_mypy(
         cls,
         paths: List[Path],
         *,
         opts: Optional[List[str]] = None,
+        daemon: bool = False,
+        jobs: int = 1,
     ) -> MypyResults:
-        """Generate results from mypy."""
+        """Generate results from mypy (or from the mypy daemon)."""
+        import mypy.api
 
         if opts is None:
             opts = mypy_argv[:]
         abspath_errors = {
-            str(path.resolve()): [] for path in paths
+            os.path.realpath(path): [] for path in paths
         }  # type: MypyResults._abspath_errors_type
 
-        cwd = Path.cwd()
-        stdout, stderr, status = mypy.api.run(
-            opts + [str(Path(key).relative_to(cwd)) for key in abspath_errors.keys()]
-        )
+        cwd = os.getcwd()
+        relpaths = [os.path.relpath(abspath, cwd) for abspath in abspath_errors]
+        if daemon:
+            stdout, stderr, status = _mypy_run_daemon(opts + relpaths)
+        # Fall back to plain mypy if the daemon could not check anything
+        # (e.g. it failed to start). Usage errors are then reported by mypy.
+        if not daemon or (status == 2 and not stdout):
+            if jobs > 1 and len(relpaths) > 1:
+                stdout, stderr, status = _mypy_run_shards(opts, relpaths, jobs)
+            else:
+                stdout, stderr, status = mypy.api.run(opts + relpaths)
 
+        # mypy usually reports several lines per file,
+        # so only resolve each distinct path once.
+        # mypy echoes the paths it was given, which are already resolved.
+        abspaths = dict(zip(relpaths, abspath_errors))
         unmatched_lines = []
         for line in stdout.split("\n"):
             if not line:
                 continue
             path, _, error = line.partition(":")
-            abspath = str(Path(path).resolve())
+            try:
+                abspath = abspaths[path]
+            except KeyError:
+                abspath = abspaths[path] = os.path.realpath(path)
             try:
                 abspath_errors[abspath].append(line)
             except KeyError:
@@ -351,28 +639,77 @@ class MypyResults:
             stdout=stdout,
             stderr=stderr,
             status=status,
-            abspath_errors=abspath_errors,
+            # Files without errors are left out to keep the cached results small.
+            abspath_errors={
+                abspath: errors for abspath, errors in abspath_errors.items() if errors
+            },
             unmatched_stdout="\n".join(unmatched_lines),
         )
 
     @classmethod
     def from_session(cls, session: pytest.Session) -> MypyResults:
         """Load (or generate) cached mypy results for a pytest session."""
+        try:
+            return session.stash[_session_results_key]
+        except KeyError:
+            pass
         mypy_results_path = session.config.stash[stash_key["config"]].mypy_results_path
-        with FileLock(str(mypy_results_path) + ".lock"):
-            try:
-                with open(mypy_results_path, mode="rb") as results_f:
-                    results = cls.load(results_f)
-            except FileNotFoundError:
-                results = cls.from_mypy(
-                    [
-                        item.path
-                        for item in session.items
-                        if isinstance(item, MypyFileItem)
-                    ],
-                )
-                with open(mypy_results_path, mode="wb") as results_f:
-                    results.dump(results_f)
+        # Results are published atomically, so they can be read without the
+        # lock, which is then only needed to make sure mypy runs once.
+        results = cls._load_if_exists(mypy_results_path)
+        if results is None:
+            from filelock import FileLock
+
+            with FileLock(str(mypy_results_path) + ".lock"):
+                # Another process may have published results
+                # while this one was waiting for the lock.
+                results = cls._load_if_exists(mypy_results_path)
+                if results is None:  # pragma: no branch
+                    results = cls._from_session_items(session)
+                    tmp_path = Path(str(mypy_results_path) + ".tmp")
+                    with open(tmp_path, mode="wb") as results_f:
+                        results.dump(results_f)
+                    os.replace(tmp_path, mypy_results_path)
+        session.stash[_session_results_key] = results
+        return results
+
+    @classmethod
+    def _from_session_items(cls, session: pytest.Session) -> MypyResults:
+        paths = [item.path for item in session.items if isinstance(item, MypyFileItem)]
+        opts = [*mypy_argv, *session.config.stash[_cli_argv_key]]
+        reusable_inputs = None
+        if session.config.option.mypy_reuse_results:
+            import mypy.version
+
+            # mypy may also read its config file from a parent directory
+            # or from the user's home directory, so ask mypy which one it uses.
+            options = _mypy_options(opts)
+            config_file = options.config_file if options else None
+            reusable_inputs = {
+                "mypy_version": mypy.version.__version__,
+                "opts": opts,
+                "config_files": {
+                    os.path.realpath(path): _stat_signature(path)
+                    for path in filter(None, [config_file])
+                },
+                "files": {
+                    os.path.realpath(path): _stat_signature(path) for path in paths
+                },
+            }
+            previous = session.config.cache.get(_reusable_results_cache_key, None)
+            if previous is not None and previous["inputs"] == reusable_inputs:
+                return cls(**previous["results"])
+        results = cls.from_mypy(
+            paths,
+            opts=opts,
+            daemon=session.config.option.mypy_daemon,
+            jobs=session.config.option.mypy_jobs or 1,
+        )
+        if reusable_inputs is not None:
+            session.config.cache.set(
+                _reusable_results_cache_key,
+                {"inputs": reusable_inputs, "results": vars(results)},
+            )
         return results
 
 
@@ -406,13 +743,14 @@ class MypyControllerPlugin:
             if config.option.mypy_xfail:
                 terminalreporter.write(results.stdout)
             else:
-                for note in (
+                notes = [
                     unreported_note
                     for errors in results.abspath_errors.values()
                     if all(_error_severity(error) == "note" for error in errors)
                     for unreported_note in errors
-                ):
-                    terminalreporter.write_line(note)
+                ]
+                if notes:
+                    terminalreporter.write_line("\n".join(notes))
                 if results.unmatched_stdout:
                     color = {"red": True} if results.status else {"green": True}
                     terminalreporter.write_line(results.unmatched_stdout, **color)
@@ -3,5 +3,28 @@ import mypy.version
 pytest_plugins = "pytester"
 
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "xdist_matrix: run with xdist active, inactive and disabled",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if (
+        "xdist_args" in metafunc.fixturenames
+        and metafunc.definition.get_closest_marker("xdist_matrix")
+    ):
+        metafunc.parametrize(
+            "xdist_args",
+            [
+                True,  # xdist enabled, active
+                False,  # xdist enabled, inactive
+                None,  # xdist disabled
+            ],
+            indirect=True,
+        )
+
+
 def pytest_report_header():
     return f"mypy: {mypy.version.__version__}"
@@ -1,7 +1,10 @@
+import os
 import signal
+import subprocess
 import sys
 import textwrap
 
+import mypy.api
 import mypy.version
 from packaging.version import Version
 import pytest
@@ -21,21 +24,64 @@ PYTHON_VERSION = Version(
         ]
     )
 )
+# Plugins that none of the runpytest() tests need.
+UNUSED_PLUGIN_ARGS = [
+    *("-p", "no:cacheprovider"),
+    *("-p", "no:doctest"),
+    *("-p", "no:junitxml"),
+    *("-p", "no:stepwise"),
+]
 
 
-@pytest.fixture(
-    params=[
-        True,  # xdist enabled, active
-        False,  # xdist enabled, inactive
-        None,  # xdist disabled
-    ],
-)
+@pytest.fixture
 def xdist_args(request):
-    if request.param is None:
+    xdist = getattr(request, "param", None)  # see conftest.pytest_generate_tests
+    if xdist is None:
         return ["-p", "no:xdist"]
-    return ["-n", "auto"] if request.param else []
+    return ["-n", "2"] if xdist else []
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mypy_cache_dir(tmp_path_factory):
+    """Share one mypy cache so that the stdlib stubs are only analyzed once."""
+    cache_dir = tmp_path_factory.mktemp("mypy_cache")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MYPY_CACHE_DIR", str(cache_dir))
+        yield cache_dir
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mypy_modules(tmp_path_factory, mypy_cache_dir):
+    """Import the modules mypy loads lazily before pytester snapshots sys.modules."""
+    path = tmp_path_factory.mktemp("mypy_modules") / "warmup.py"
+    path.write_text("x: int = 1\n")
+    mypy.api.run([str(path)])
+
+
+def runpytest(testdir, *args):
+    """Run pytest in-process unless xdist workers need their own process."""
+    args = (*UNUSED_PLUGIN_ARGS, *args)
+    if "-n" in args:
+        return testdir.runpytest_subprocess(*args)
+    return testdir.runpytest(*args)
+
 
+@pytest.mark.xdist_matrix
+def test_baseline_no_mypy(testdir, xdist_args):
+    """Verify that nothing is collected from a module without --mypy."""
+    testdir.makepyfile(
+        """
+            def pyfunc(x: int) -> str:
+                return x * 2
+        """,
+    )
+    result = runpytest(testdir, *xdist_args)
+    result.assert_outcomes()
+    assert "_mypy_results_path" not in result.stderr.str()
+    assert result.ret == pytest.ExitCode.NO_TESTS_COLLECTED
 
+
+@pytest.mark.xdist_matrix
 @pytest.mark.parametrize("pyfile_count", [1, 2])
 def test_mypy_success(testdir, pyfile_count, xdist_args):
     """Verify that running on a module with no type errors passes."""
@@ -50,10 +96,7 @@ def test_mypy_success(testdir, pyfile_count, xdist_args):
             for pyfile_i in range(pyfile_count)
         },
     )
-    result = testdir.runpytest_subprocess(*xdist_args)
-    result.assert_outcomes()
-    assert result.ret == pytest.ExitCode.NO_TESTS_COLLECTED
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = pyfile_count
     mypy_status_check = 1
     mypy_checks = mypy_file_checks + mypy_status_check
@@ -85,6 +128,25 @@ def test_mypy_encoding_warnings(testdir, monkeypatch):
     result.assert_outcomes(passed=mypy_checks, warnings=expected_warnings)
 
 
+def test_mypy_not_imported(testdir, xdist_args):
+    """Ensure that mypy is not imported unless the plugin is enabled."""
+    testdir.makepyfile(
+        conftest="""
+            import sys
+
+            def pytest_sessionfinish(session):
+                assert "mypy" not in sys.modules
+        """,
+        test_nothing="""
+            def test_nothing():
+                pass
+        """,
+    )
+    result = testdir.runpytest_subprocess(*xdist_args)
+    result.assert_outcomes(passed=1)
+    assert result.ret == pytest.ExitCode.OK
+
+
 def test_mypy_pyi(testdir, xdist_args):
     """
     Verify that a .py file will be skipped if
@@ -106,9 +168,9 @@ def test_mypy_pyi(testdir, xdist_args):
         """,
     )
 
-    result = testdir.runpytest_subprocess(*xdist_args)
+    result = runpytest(testdir, *xdist_args)
     result.assert_outcomes()
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     mypy_checks = mypy_file_checks + mypy_status_check
@@ -116,6 +178,7 @@ def test_mypy_pyi(testdir, xdist_args):
     assert result.ret == pytest.ExitCode.OK
 
 
+@pytest.mark.xdist_matrix
 def test_mypy_error(testdir, xdist_args):
     """Verify that running on a module with type errors fails."""
     testdir.makepyfile(
@@ -124,11 +187,7 @@ def test_mypy_error(testdir, xdist_args):
                 return x * 2
         """,
     )
-    result = testdir.runpytest_subprocess(*xdist_args)
-    result.assert_outcomes()
-    assert "_mypy_results_path" not in result.stderr.str()
-    assert result.ret == pytest.ExitCode.NO_TESTS_COLLECTED
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     mypy_checks = mypy_file_checks + mypy_status_check
@@ -147,9 +206,9 @@ def test_mypy_annotation_unchecked(testdir, xdist_args, tmp_path, monkeypatch):
                 return x * y
         """,
     )
-    result = testdir.runpytest_subprocess(*xdist_args)
+    result = runpytest(testdir, *xdist_args)
     result.assert_outcomes()
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     mypy_checks = mypy_file_checks + mypy_status_check
@@ -177,7 +236,7 @@ def test_mypy_ignore_missings_imports(testdir, xdist_args):
             module_name=module_name,
         ),
     )
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     mypy_checks = mypy_file_checks + mypy_status_check
@@ -190,7 +249,7 @@ def test_mypy_ignore_missings_imports(testdir, xdist_args):
         ],
     )
     assert result.ret == pytest.ExitCode.TESTS_FAILED
-    result = testdir.runpytest_subprocess("--mypy-ignore-missing-imports", *xdist_args)
+    result = runpytest(testdir, "--mypy-ignore-missing-imports", *xdist_args)
     result.assert_outcomes(passed=mypy_checks)
     assert result.ret == pytest.ExitCode.OK
 
@@ -203,7 +262,7 @@ def test_mypy_config_file(testdir, xdist_args):
                 return x * 2
         """,
     )
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     mypy_checks = mypy_file_checks + mypy_status_check
@@ -215,7 +274,8 @@ def test_mypy_config_file(testdir, xdist_args):
             disallow_untyped_defs = True
         """,
     )
-    result = testdir.runpytest_subprocess(
+    result = runpytest(
+        testdir,
         "--mypy-config-file",
         mypy_config_file,
         *xdist_args,
@@ -223,6 +283,461 @@ def test_mypy_config_file(testdir, xdist_args):
     result.assert_outcomes(failed=mypy_checks)
 
 
+def test_mypy_cache_dir(testdir, xdist_args, monkeypatch):
+    """Verify that --mypy-cache-dir moves mypy's cache."""
+    monkeypatch.delenv("MYPY_CACHE_DIR")  # so mypy would default to .mypy_cache
+    testdir.makepyfile("")
+    result = runpytest(
+        testdir,
+        "--mypy-cache-dir",
+        "custom_cache",
+        *xdist_args,
+    )
+    mypy_file_checks = 1
+    mypy_status_check = 1
+    result.assert_outcomes(passed=mypy_file_checks + mypy_status_check)
+    assert testdir.tmpdir.join("custom_cache").isdir()
+    assert not testdir.tmpdir.join(".mypy_cache").exists()
+
+
+@pytest.mark.xdist_matrix
+def test_mypy_no_incremental(testdir, xdist_args):
+    """Verify that --mypy-no-incremental makes mypy ignore its cache."""
+    testdir.makepyfile(
+        conftest="""
+            import mypy.api
+
+            def pytest_configure(config):
+                run = mypy.api.run
+                def run_no_incremental(args):
+                    assert "--no-incremental" in args
+                    return run(args)
+                mypy.api.run = run_no_incremental
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-no-incremental", *xdist_args)
+    mypy_file_checks = 1
+    mypy_status_check = 1
+    result.assert_outcomes(passed=mypy_file_checks + mypy_status_check)
+    assert result.ret == pytest.ExitCode.OK
+
+
+def test_mypy_daemon_no_incremental(testdir):
+    """Verify that --mypy-daemon rejects --mypy-no-incremental."""
+    result = runpytest(testdir, "--mypy-daemon", "--mypy-no-incremental")
+    result.stderr.fnmatch_lines(
+        ["ERROR: --mypy-no-incremental cannot be combined with --mypy-daemon*"],
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+
+
+@pytest.mark.xdist_matrix
+def test_mypy_daemon(testdir, xdist_args):
+    """Verify that --mypy-daemon reuses the mypy daemon across sessions."""
+    testdir.makepyfile(
+        """
+            def pyfunc(x: int) -> str:
+                return x * 2
+        """,
+    )
+    mypy_file_checks = 1
+    mypy_status_check = 1
+    mypy_checks = mypy_file_checks + mypy_status_check
+    try:
+        result = testdir.runpytest_subprocess("--mypy-daemon", *xdist_args)
+        result.assert_outcomes(failed=mypy_checks)
+        result.stdout.fnmatch_lines(
+            ["2: error: Incompatible return value*", "Daemon started"],
+        )
+        assert result.ret == pytest.ExitCode.TESTS_FAILED
+        result = testdir.runpytest_subprocess("--mypy-daemon", *xdist_args)
+        result.assert_outcomes(failed=mypy_checks)
+        result.stdout.fnmatch_lines(["2: error: Incompatible return value*"])
+        assert "Daemon started" not in result.stdout.str()
+        assert result.ret == pytest.ExitCode.TESTS_FAILED
+    finally:
+        testdir.run(sys.executable, "-m", "mypy.dmypy", "stop")
+
+
+@pytest.mark.xdist_matrix
+def test_mypy_daemon_output_pipe(testdir, xdist_args):
+    """Verify that the mypy daemon does not keep pytest's output pipe open."""
+    testdir.makepyfile("")
+    try:
+        # pytester redirects output to files, so read it through a pipe here.
+        completed = subprocess.run(
+            [sys.executable, "-m", "pytest", "--mypy-daemon", *xdist_args],
+            cwd=str(testdir.tmpdir),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=120,
+        )
+    finally:
+        testdir.run(sys.executable, "-m", "mypy.dmypy", "stop")
+    assert completed.returncode == pytest.ExitCode.OK, completed.stdout
+
+
+@pytest.mark.xdist_matrix
+def test_mypy_daemon_fallback(testdir, xdist_args):
+    """Verify that mypy runs without the daemon if the daemon fails."""
+    testdir.makepyfile(
+        conftest="""
+            def pytest_configure(config):
+                def run_daemon(args):
+                    return "", "Timed out waiting for daemon to start\\n", 2
+                plugin = config.pluginmanager.getplugin("mypy")
+                plugin._mypy_run_daemon = run_daemon
+        """,
+        bad="""
+            def pyfunc(x: int) -> str:
+                return x * 2
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-daemon", *xdist_args)
+    mypy_file_checks = 2
+    mypy_status_check = 1
+    result.assert_outcomes(passed=1, failed=mypy_file_checks - 1 + mypy_status_check)
+    result.stdout.fnmatch_lines(["2: error: Incompatible return value*"])
+    assert "Timed out waiting for daemon to start" not in result.stdout.str()
+
+
+@pytest.mark.parametrize("fixed_format_cache", [False, True])
+def test_mypy_fixed_format_cache(testdir, fixed_format_cache):
+    """Verify that --mypy-fixed-format-cache only passes the flag when needed."""
+    testdir.makepyfile(
+        conftest=f"""
+            import types
+
+            import mypy.api
+            import mypy.options
+
+            def pytest_configure(config):
+                mypy.options.Options = lambda: types.SimpleNamespace(
+                    fixed_format_cache={fixed_format_cache},
+                )
+
+                def run(args):
+                    flag = "--fixed-format-cache" in args
+                    assert flag is not {fixed_format_cache}
+                    return "", "", 0
+
+                mypy.api.run = run
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-fixed-format-cache")
+    conftest_checks = 1
+    mypy_status_check = 1
+    result.assert_outcomes(passed=conftest_checks + mypy_status_check)
+
+
+def test_mypy_fixed_format_cache_unsupported(testdir):
+    """Verify that --mypy-fixed-format-cache requires a mypy that supports it."""
+    testdir.makepyfile(
+        conftest="""
+            import types
+
+            import mypy.options
+
+            def pytest_configure(config):
+                mypy.options.Options = types.SimpleNamespace
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-fixed-format-cache")
+    result.stderr.fnmatch_lines(
+        ["ERROR: --mypy-fixed-format-cache requires mypy 1.18 or later"],
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+
+
+@pytest.mark.xdist_matrix
+def test_mypy_jobs(testdir, xdist_args):
+    """Verify that --mypy-jobs splits the files among mypy processes."""
+    testdir.makepyfile(
+        bad="""
+            def pyfunc(x: int) -> str:
+                return x * 2
+        """,
+        good="""
+            def pyfunc(x: int) -> int:
+                return x * 2
+        """,
+    )
+    result = testdir.runpytest_subprocess(
+        "--mypy-jobs",
+        "2",
+        "--mypy-cache-dir",
+        "custom_cache",
+        *xdist_args,
+    )
+    mypy_file_checks = 2
+    mypy_status_check = 1
+    result.assert_outcomes(passed=1, failed=mypy_file_checks - 1 + mypy_status_check)
+    result.stdout.fnmatch_lines(
+        [
+            "2: error: Incompatible return value*",
+            "Found 1 error in 1 file (checked 2 source files)",
+        ],
+    )
+    assert "Success" not in result.stdout.str()
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+    assert testdir.tmpdir.join("custom_cache", "shard-1").isdir()
+    testdir.makepyfile(
+        bad="""
+            def pyfunc(x: int) -> int:
+                return x * 2
+        """,
+    )
+    result = testdir.runpytest_subprocess(
+        "--mypy-jobs",
+        "2",
+        "--mypy-cache-dir",
+        "custom_cache",
+        *xdist_args,
+    )
+    result.assert_outcomes(passed=mypy_file_checks + mypy_status_check)
+    result.stdout.fnmatch_lines(["Success: no issues found in 2 source files"])
+    assert result.ret == pytest.ExitCode.OK
+
+
+def test_mypy_jobs_blocking_error(testdir):
+    """Verify that --mypy-jobs summarizes errors that stopped a shard."""
+    testdir.makepyfile(
+        bad="""
+            def pyfunc(x: int) -> int
+                return x * 2
+        """,
+        good="""
+            def pyfunc(x: int) -> int:
+                return x * 2
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-jobs", "2")
+    result.stdout.fnmatch_lines(
+        ["Found 1 error in 1 file (errors prevented further checking)"],
+    )
+    assert "Success" not in result.stdout.str()
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+
+
+def test_mypy_jobs_no_error_summary(testdir):
+    """Verify that --mypy-jobs does not add a summary that mypy would not."""
+    testdir.makefile(
+        ".ini",
+        mypy="""
+            [mypy]
+            error_summary = False
+        """,
+    )
+    testdir.makepyfile(
+        bad="""
+            def pyfunc(x: int) -> str:
+                return x * 2
+        """,
+        good="""
+            def pyfunc(x: int) -> int:
+                return x * 2
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-jobs", "2")
+    mypy_file_checks = 2
+    mypy_status_check = 1
+    result.assert_outcomes(passed=1, failed=mypy_file_checks - 1 + mypy_status_check)
+    assert "Found" not in result.stdout.str()
+    assert "Success" not in result.stdout.str()
+
+
+def test_mypy_jobs_pretty(tmp_path, monkeypatch):
+    """Verify that --mypy-jobs reports each --pretty message once and in one piece."""
+    monkeypatch.chdir(tmp_path)
+    # mypy does not report errors in imported modules found on $PYTHONPATH.
+    monkeypatch.delenv("PYTHONPATH", raising=False)
+    monkeypatch.setenv("MYPY_FORCE_TERMINAL_WIDTH", "60")
+    bad1_path = tmp_path / "bad1.py"
+    bad1_path.write_text(
+        "import bad2\n\ndef pyfunc(x: int) -> str:\n    return x * 2\n"
+    )
+    bad2_path = tmp_path / "bad2.py"
+    bad2_path.write_text("def pyfunc(x: int) -> str:\n    return x * 2\n")
+    opts = ["--pretty", f"--cache-dir={os.devnull}"]
+    paths = ["bad1.py", "bad2.py"]
+    assert pytest_mypy._mypy_run_shards(opts, paths, 2) == mypy.api.run(opts + paths)
+
+
+@pytest.mark.parametrize(
+    "files, shard_cache_dir",
+    [
+        (
+            {
+                "mypy.ini": """
+                    [mypy]
+                    cache_dir = ini_cache
+                """,
+            },
+            "ini_cache",
+        ),
+        (
+            {
+                "conftest.py": """
+                    def pytest_configure(config):
+                        plugin = config.pluginmanager.getplugin("mypy")
+                        plugin.mypy_argv.extend(["--cache-dir", "argv_cache"])
+                """,
+            },
+            "argv_cache",
+        ),
+        (
+            {
+                "mypy.ini": f"""
+                    [mypy]
+                    cache_dir = {os.devnull}
+                """,
+            },
+            None,
+        ),
+    ],
+)
+def test_mypy_jobs_cache_dir(testdir, monkeypatch, files, shard_cache_dir):
+    """Verify that --mypy-jobs puts the shard caches where mypy's cache is."""
+    monkeypatch.delenv("MYPY_CACHE_DIR")
+    for name, source in files.items():
+        testdir.tmpdir.join(name).write(textwrap.dedent(source))
+    testdir.makepyfile(a="", b="")
+    result = testdir.runpytest_subprocess("--mypy-jobs", "2")
+    assert result.ret == pytest.ExitCode.OK
+    if shard_cache_dir is None:
+        assert not testdir.tmpdir.join(".mypy_cache").exists()
+    else:
+        assert testdir.tmpdir.join(shard_cache_dir, "shard-1").isdir()
+
+
+def test_mypy_jobs_invalid_option(testdir):
+    """Verify that --mypy-jobs lets mypy report invalid options."""
+    testdir.makepyfile(
+        conftest="""
+            def pytest_configure(config):
+                plugin = config.pluginmanager.getplugin("mypy")
+                plugin.mypy_argv.append("--no-such-option")
+        """,
+        a="",
+    )
+    result = testdir.runpytest_subprocess("--mypy-jobs", "2")
+    result.stdout.fnmatch_lines(["*unrecognized arguments: --no-such-option*"])
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+
+
+def test_mypy_jobs_package(testdir, xdist_args):
+    """Verify that --mypy-jobs does not split a package among mypy processes."""
+    testdir.makepyfile(
+        **{
+            "pkg/__init__": "",
+            "pkg/bad": """
+                def pyfunc(x: int) -> str:
+                    return x * 2
+            """,
+            "pkg/good": """
+                def pyfunc(x: int) -> int:
+                    return x * 2
+            """,
+        },
+    )
+    result = testdir.runpytest_subprocess("--mypy-jobs", "2", *xdist_args)
+    mypy_file_checks = 3
+    mypy_status_check = 1
+    result.assert_outcomes(passed=2, failed=mypy_file_checks - 2 + mypy_status_check)
+    result.stdout.fnmatch_lines(["Found 1 error in 1 file (checked 3 source files)"])
+
+
+@pytest.mark.xdist_matrix
+def test_mypy_reuse_results(testdir, xdist_args, monkeypatch):
+    """Verify that --mypy-reuse-results only skips mypy for unchanged inputs."""
+    testdir.makepyfile(
+        conftest="""
+            import os
+
+            import mypy.api
+
+            def pytest_configure(config):
+                if os.environ.get("PYTEST_MYPY_MUST_NOT_RUN"):
+                    def run(args):
+                        raise AssertionError("mypy ran")
+                    mypy.api.run = run
+        """,
+        bad="""
+            def pyfunc(x: int) -> str:
+                return x * 2
+        """,
+    )
+    mypy_file_checks = 2
+    mypy_status_check = 1
+    result = testdir.runpytest_subprocess("--mypy-reuse-results", *xdist_args)
+    result.assert_outcomes(passed=1, failed=mypy_file_checks - 1 + mypy_status_check)
+    monkeypatch.setenv("PYTEST_MYPY_MUST_NOT_RUN", "1")
+    result = testdir.runpytest_subprocess("--mypy-reuse-results", *xdist_args)
+    result.assert_outcomes(passed=1, failed=mypy_file_checks - 1 + mypy_status_check)
+    result.stdout.fnmatch_lines(["2: error: Incompatible return value*"])
+    monkeypatch.delenv("PYTEST_MYPY_MUST_NOT_RUN")
+    testdir.makefile(
+        ".ini",
+        mypy="""
+            [mypy]
+            disallow_untyped_defs = True
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-reuse-results", *xdist_args)
+    result.assert_outcomes(failed=mypy_file_checks + mypy_status_check)
+    testdir.makepyfile(
+        bad="""
+            def pyfunc(x: int) -> int:
+                return x * 2
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-reuse-results", *xdist_args)
+    result.assert_outcomes(passed=1, failed=mypy_file_checks - 1 + mypy_status_check)
+    result.stdout.fnmatch_lines(["*conftest.py*error: Function is missing*"])
+
+
+@pytest.mark.skipif(
+    MYPY_VERSION < Version("1.15"),
+    reason="mypy 1.15 started looking for config files in parent directories.",
+)
+def test_mypy_reuse_results_parent_config_file(testdir, monkeypatch):
+    """Verify that --mypy-reuse-results notices the config file mypy finds."""
+    testdir.mkdir(".git")
+    subdir = testdir.mkdir("subdir")
+    subdir.join("untyped.py").write(
+        textwrap.dedent(
+            """
+                def pyfunc(x):
+                    return x * 2
+            """,
+        ),
+    )
+    monkeypatch.chdir(subdir)
+    mypy_file_checks = 1
+    mypy_status_check = 1
+    result = testdir.runpytest_subprocess("--mypy-reuse-results")
+    result.assert_outcomes(passed=mypy_file_checks + mypy_status_check)
+    testdir.makefile(
+        ".ini",
+        mypy="""
+            [mypy]
+            disallow_untyped_defs = True
+        """,
+    )
+    result = testdir.runpytest_subprocess("--mypy-reuse-results")
+    result.assert_outcomes(failed=mypy_file_checks + mypy_status_check)
+    result.stdout.fnmatch_lines(["*untyped.py*error: Function is missing*"])
+
+
+def test_mypy_reuse_results_no_cacheprovider(testdir):
+    """Verify that --mypy-reuse-results requires the pytest cache."""
+    result = runpytest(testdir, "--mypy-reuse-results", "-p", "no:cacheprovider")
+    result.stderr.fnmatch_lines(
+        ["ERROR: --mypy-reuse-results requires the cacheprovider plugin*"],
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+
+
 def test_mypy_marker(testdir, xdist_args):
     """Verify that -m mypy only runs the mypy tests."""
     testdir.makepyfile(
@@ -231,14 +746,14 @@ def test_mypy_marker(testdir, xdist_args):
                 assert False
         """,
     )
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     test_count = 1
     mypy_file_checks = 1
     mypy_status_check = 1
     mypy_checks = mypy_file_checks + mypy_status_check
     result.assert_outcomes(failed=test_count, passed=mypy_checks)
     assert result.ret == pytest.ExitCode.TESTS_FAILED
-    result = testdir.runpytest_subprocess("--mypy", "-m", "mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", "-m", "mypy", *xdist_args)
     result.assert_outcomes(passed=mypy_checks)
     assert result.ret == pytest.ExitCode.OK
 
@@ -260,9 +775,6 @@ def test_non_mypy_error(testdir, xdist_args):
             message=message,
         ),
     )
-    result = testdir.runpytest_subprocess(*xdist_args)
-    result.assert_outcomes()
-    assert result.ret == pytest.ExitCode.NO_TESTS_COLLECTED
     result = testdir.runpytest_subprocess("--mypy", *xdist_args)
     mypy_file_checks = 1  # conftest.py
     mypy_status_check = 1
@@ -325,6 +837,22 @@ def test_api_mypy_argv(testdir, xdist_args):
     assert result.ret == pytest.ExitCode.OK
 
 
+def test_mypy_argv_unchanged_by_cli(testdir, xdist_args):
+    """Ensure that CLI options do not accumulate in mypy_argv."""
+    testdir.makepyfile(
+        conftest="""
+            def pytest_sessionstart(session):
+                plugin = session.config.pluginmanager.getplugin('mypy')
+                assert plugin.mypy_argv == []
+        """,
+    )
+    result = testdir.runpytest_subprocess(
+        "--mypy-ignore-missing-imports",
+        *xdist_args,
+    )
+    assert result.ret == pytest.ExitCode.OK
+
+
 def test_api_nodeid_name(testdir, xdist_args):
     """Ensure that the plugin can be configured in a conftest.py."""
     nodeid_name = "UnmistakableNodeIDName"
@@ -420,7 +948,7 @@ def test_pyproject_toml(testdir, xdist_args):
                 return x * 2
         """,
     )
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     result.stdout.fnmatch_lines(["1: error: Function is missing a type annotation*"])
     assert result.ret == pytest.ExitCode.TESTS_FAILED
 
@@ -440,7 +968,7 @@ def test_setup_cfg(testdir, xdist_args):
                 return x * 2
         """,
     )
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     result.stdout.fnmatch_lines(["1: error: Function is missing a type annotation*"])
     assert result.ret == pytest.ExitCode.TESTS_FAILED
 
@@ -536,6 +1064,25 @@ def test_mypy_results_from_mypy_with_opts():
     assert str(MYPY_VERSION) in mypy_results.stdout
 
 
+def test_mypy_results_from_mypy_defaults_to_mypy_argv(monkeypatch):
+    """MypyResults.from_mypy uses mypy_argv when no options are passed."""
+    monkeypatch.setattr(pytest_mypy, "mypy_argv", ["--version"])
+    mypy_results = pytest_mypy.MypyResults.from_mypy([])
+    assert mypy_results.opts == ["--version"]
+    assert str(MYPY_VERSION) in mypy_results.stdout
+
+
+def test_mypy_results_from_mypy_omits_clean_files(tmp_path, monkeypatch):
+    """MypyResults.from_mypy only keeps entries for files with errors."""
+    monkeypatch.chdir(tmp_path)
+    good_path = tmp_path / "good.py"
+    good_path.write_text("def pyfunc(x: int) -> int:\n    return x * 2\n")
+    bad_path = tmp_path / "bad.py"
+    bad_path.write_text("def pyfunc(x: int) -> str:\n    return x * 2\n")
+    mypy_results = pytest_mypy.MypyResults.from_mypy([good_path, bad_path], opts=[])
+    assert list(mypy_results.abspath_errors) == [str(bad_path.resolve())]
+
+
 def test_mypy_no_output(testdir, xdist_args):
     """No terminal summary is shown if there is no output from mypy."""
     testdir.makepyfile(
@@ -580,12 +1127,12 @@ def test_py_typed(testdir):
 def test_mypy_no_status_check(testdir, xdist_args):
     """Verify that --mypy-no-status-check disables MypyStatusItem collection."""
     testdir.makepyfile("one: int = 1")
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     result.assert_outcomes(passed=mypy_file_checks + mypy_status_check)
     assert result.ret == pytest.ExitCode.OK
-    result = testdir.runpytest_subprocess("--mypy-no-status-check", *xdist_args)
+    result = runpytest(testdir, "--mypy-no-status-check", *xdist_args)
     result.assert_outcomes(passed=mypy_file_checks)
     assert result.ret == pytest.ExitCode.OK
 
@@ -593,12 +1140,12 @@ def test_mypy_no_status_check(testdir, xdist_args):
 def test_mypy_xfail_passes(testdir, xdist_args):
     """Verify that --mypy-xfail passes passes."""
     testdir.makepyfile("one: int = 1")
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     result.assert_outcomes(passed=mypy_file_checks + mypy_status_check)
     assert result.ret == pytest.ExitCode.OK
-    result = testdir.runpytest_subprocess("--mypy-xfail", *xdist_args)
+    result = runpytest(testdir, "--mypy-xfail", *xdist_args)
     result.assert_outcomes(passed=mypy_file_checks + mypy_status_check)
     assert result.ret == pytest.ExitCode.OK
 
@@ -606,12 +1153,12 @@ def test_mypy_xfail_passes(testdir, xdist_args):
 def test_mypy_xfail_xfails(testdir, xdist_args):
     """Verify that --mypy-xfail xfails failures."""
     testdir.makepyfile("one: str = 1")
-    result = testdir.runpytest_subprocess("--mypy", *xdist_args)
+    result = runpytest(testdir, "--mypy", *xdist_args)
     mypy_file_checks = 1
     mypy_status_check = 1
     result.assert_outcomes(failed=mypy_file_checks + mypy_status_check)
     assert result.ret == pytest.ExitCode.TESTS_FAILED
-    result = testdir.runpytest_subprocess("--mypy-xfail", *xdist_args)
+    result = runpytest(testdir, "--mypy-xfail", *xdist_args)
     result.assert_outcomes(xfailed=mypy_file_checks + mypy_status_check)
     assert result.ret == pytest.ExitCode.OK
 